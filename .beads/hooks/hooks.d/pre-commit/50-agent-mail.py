@@ -1,21 +1,8 @@
 #!/usr/bin/env python3
 # mcp-agent-mail guard hook (pre-commit)
-import json
 import os
 import sys
 import subprocess
-from pathlib import Path
-import fnmatch as _fn
-from datetime import datetime, timezone
-
-# Optional Git pathspec support (preferred when available)
-try:
-    from pathspec import PathSpec as _PS  # type: ignore[import-not-found]
-except Exception:
-    _PS = None  # type: ignore[assignment]
-
-FILE_RESERVATIONS_DIR = Path("/Users/ivintik/.mcp_agent_mail_git_mailbox_repo/projects/users-ivintik-dev-personal-tools-famdeck-toolkit/file_reservations")
-STORAGE_ROOT = Path("/Users/ivintik/.mcp_agent_mail_git_mailbox_repo/projects/users-ivintik-dev-personal-tools-famdeck-toolkit")
 
 # Gate variables (presence) and mode
 GATE = (os.environ.get("WORKTREES_ENABLED","0") or os.environ.get("GIT_IDENTITY_ENABLED","0") or "0")
@@ -37,39 +24,49 @@ if not AGENT_NAME:
     sys.stderr.write("[pre-commit] AGENT_NAME environment variable is required.\n")
     sys.exit(1)
 
-# Collect staged paths (name-only) and expand renames/moves (old+new)
+# Collect staged paths and expand renames/copies (old+new) from a single
+# name-status listing
 paths = []
 try:
-    co = subprocess.run(["git","diff","--cached","--name-only","-z","--diff-filter=ACMRDTU"],
+    cs = subprocess.run(["git","diff","--cached","--name-status","-M","-z","--diff-filter=ACMRDTU"],
                         check=True,capture_output=True)
-    data = co.stdout.decode("utf-8","ignore")
-    for p in data.split("\x00"):
-        if p:
-            paths.append(p)
-    # Rename detection: capture both old and new names
-    cs = subprocess.run(["git","diff","--cached","--name-status","-M","-z"],
-                        check=True,capture_output=True)
-    sdata = cs.stdout.decode("utf-8","ignore")
-    parts = [x for x in sdata.split("\x00") if x]
+    # Split the raw bytes and decode each path on its own; empty fields are
+    # dropped before any str is built
+    parts = [x for x in cs.stdout.split(b"\x00") if x]
     i = 0
     while i < len(parts):
         status = parts[i]
         i += 1
-        if status.startswith("R") and i + 1 < len(parts):
-            oldp = parts[i]; newp = parts[i+1]; i += 2
-            if oldp: paths.append(oldp)
-            if newp: paths.append(newp)
+        if status[:1] in (b"R", b"C") and i + 1 < len(parts):
+            paths.append(parts[i].decode("utf-8","ignore"))
+            paths.append(parts[i+1].decode("utf-8","ignore"))
+            i += 2
         else:
             # Status followed by one path
             if i < len(parts):
-                pth = parts[i]; i += 1
-                if pth: paths.append(pth)
+                paths.append(parts[i].decode("utf-8","ignore")); i += 1
 except Exception:
     pass
 
+# Drop duplicate (and fully undecodable) paths, keeping first-seen order
+paths = [p for p in dict.fromkeys(paths) if p]
 if not paths:
     sys.exit(0)
 
+# Everything below only runs when something is staged; defer the heavier
+# imports (and the optional third-party ones, until after the clean-marker
+# check) so empty commits pay for none of them.
+import fnmatch
+import hashlib
+import json
+import pickle
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+FILE_RESERVATIONS_DIR = Path("/Users/ivintik/.mcp_agent_mail_git_mailbox_repo/projects/users-ivintik-dev-personal-tools-famdeck-toolkit/file_reservations")
+STORAGE_ROOT = Path("/Users/ivintik/.mcp_agent_mail_git_mailbox_repo/projects/users-ivintik-dev-personal-tools-famdeck-toolkit")
+
 # Local conflict detection against FILE_RESERVATIONS_DIR
 def _now_utc():
     return datetime.now(timezone.utc)
@@ -86,30 +83,58 @@ def _parse_iso(value):
         return dt.astimezone(timezone.utc)
     except Exception:
         return None
+# UTC timestamps in canonical form sort lexicographically, so most records
+# are compared as strings against one precomputed "now"; anything else goes
+# through the full datetime parse.
+_UTC_TS_RE = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?)(?:Z|\+00:00)?$")
+_NOW_ISO = None
 def _not_expired(expires_ts):
+    global _NOW_ISO
+    if not expires_ts:
+        return True
+    m = _UTC_TS_RE.match(expires_ts)
+    if m:
+        if _NOW_ISO is None:
+            _NOW_ISO = _now_utc().replace(tzinfo=None).isoformat(timespec="microseconds")
+        return m.group(1) > _NOW_ISO
     parsed = _parse_iso(expires_ts)
     if parsed is None:
         return True
     return parsed > _now_utc()
+# fnmatch.fnmatch applies os.path.normcase, which folds case only on Windows
+_FN_FLAGS = re.IGNORECASE if os.name == "nt" else 0
 def _compile_one(patt):
     q = patt.replace("\\","/")
     if _PS:
         try:
             return _PS.from_lines("gitignore", [q])
         except Exception:
-            return None
-    return None
+            pass
+    # fnmatch fallback, precompiled so matching skips fnmatch's per-call cache
+    return re.compile(fnmatch.translate(q.lstrip("/")), _FN_FLAGS)
 
-# Phase 1: Pre-load and compile all reservation patterns ONCE
-compiled_patterns = []
-all_pattern_strings = []
-seen_ids = set()
-try:
-    for f in FILE_RESERVATIONS_DIR.iterdir():
-        if not f.name.endswith('.json'):
-            continue
+# Phase 0: Load raw reservation records, reusing the on-disk cache when the
+# directory listing (names, mtimes, sizes) is unchanged since the last run.
+CACHE_PATH = STORAGE_ROOT / ".reservations.cache"
+def _dir_key():
+    st = FILE_RESERVATIONS_DIR.stat()
+    entries = []
+    with os.scandir(FILE_RESERVATIONS_DIR) as it:
+        for e in it:
+            if e.name.endswith('.json'):
+                est = e.stat()
+                entries.append((e.name, est.st_mtime_ns, est.st_size))
+    entries.sort()
+    return (st.st_mtime_ns, len(entries), tuple(entries))
+def _load_records():
+    recs_out = []
+    seen_ids = set()
+    with os.scandir(FILE_RESERVATIONS_DIR) as it:
+        entries = [e.path for e in it if e.name.endswith('.json')]
+    for path in entries:
         try:
-            data = json.loads(f.read_text(encoding='utf-8'))
+            with open(path, 'rb') as fh:
+                data = _loads(fh.read())
         except Exception:
             continue
         recs = data if isinstance(data, list) else [data]
@@ -125,53 +150,237 @@ try:
             patt = (r.get('path_pattern') or '').strip()
             if not patt:
                 continue
-            # Skip virtual namespace reservations (tool://, resource://, service://) — bd-14z
-            if any(patt.startswith(pfx) for pfx in ('tool://', 'resource://', 'service://')):
-                continue
             holder = (r.get('agent') or '').strip()
             exclusive = r.get('exclusive', True)
             expires = (r.get('expires_ts') or '').strip()
-            if not exclusive:
-                continue
-            if holder and holder == AGENT_NAME:
-                continue
-            if not _not_expired(expires):
-                continue
-            # Pre-compile pattern ONCE (not per-path)
-            spec = _compile_one(patt)
-            patt_norm = patt.replace('\\','/').lstrip('/')
-            compiled_patterns.append((spec, patt, patt_norm, holder))
-            all_pattern_strings.append(patt_norm)
+            recs_out.append((patt, holder, exclusive, expires))
+    return recs_out
+def _cached_records(key):
+    if key is None:
+        return _load_records()
+    try:
+        with open(CACHE_PATH, "rb") as fh:
+            cached_key, cached_recs = pickle.load(fh)
+        if cached_key == key:
+            return cached_recs
+    except Exception:
+        pass
+    recs_out = _load_records()
+    try:
+        tmp = CACHE_PATH.with_name(f"{CACHE_PATH.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump((key, recs_out), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, CACHE_PATH)
+    except Exception:
+        pass
+    return recs_out
+
+# Phase 0b: A staged set already found clean against the same reservation
+# listing stays clean (time only expires reservations), so skip the rest.
+CLEAN_MARKER = STORAGE_ROOT / ".guard-clean.marker"
+try:
+    dir_key = _dir_key()
+except FileNotFoundError:
+    sys.exit(0)
+except Exception:
+    dir_key = None
+# No reservation files at all (the usual solo-agent case): nothing to check
+if dir_key is not None and dir_key[1] == 0:
+    sys.exit(0)
+clean_token = None
+if dir_key is not None:
+    _h = hashlib.blake2b(digest_size=16)
+    for _part in (os.getcwd(), AGENT_NAME, repr(dir_key), *sorted(paths)):
+        _h.update(_part.encode("utf-8", "surrogateescape") + b"\0")
+    clean_token = _h.hexdigest()
+    try:
+        if CLEAN_MARKER.read_text(encoding="utf-8") == clean_token:
+            sys.exit(0)
+    except OSError:
+        pass
+
+# Optional fast JSON decoder (falls back to stdlib json)
+try:
+    from orjson import loads as _loads  # type: ignore[import-not-found]
+except Exception:
+    _loads = json.loads
+
+# Optional Git pathspec support (preferred when available)
+try:
+    from pathspec import PathSpec as _PS  # type: ignore[import-not-found]
+except Exception:
+    _PS = None  # type: ignore[assignment]
+
+# Phase 1: Filter records for this agent and compile patterns ONCE
+_VIRTUAL = ('tool://', 'resource://', 'service://')
+compiled_patterns = []
+all_pattern_strings = []
+try:
+    for patt, holder, exclusive, expires in _cached_records(dir_key):
+        # Skip virtual namespace reservations (tool://, resource://, service://) — bd-14z
+        if patt.startswith(_VIRTUAL):
+            continue
+        if not exclusive:
+            continue
+        if holder and holder == AGENT_NAME:
+            continue
+        if not _not_expired(expires):
+            continue
+        # Pre-compile pattern ONCE (not per-path)
+        spec = _compile_one(patt)
+        patt_norm = patt.replace('\\','/').lstrip('/')
+        compiled_patterns.append((spec, patt, patt_norm, holder))
+        all_pattern_strings.append(patt_norm)
 except Exception:
     compiled_patterns = []
     all_pattern_strings = []
 
-# Phase 2: Build union PathSpec for fast-path rejection
+# Phase 2a: Bucket simple patterns for dict/set lookup instead of matching.
+# Literal paths and "*.ext" patterns cover most reservations; everything
+# else stays in `complex_idx` and goes through pathspec/fnmatch below.
+_LITERAL_RE = re.compile(r"^[A-Za-z0-9._/-]*[A-Za-z0-9._-]$")
+_EXT_RE = re.compile(r"^\*\.([A-Za-z0-9]+)$")
+literal_anchored = {}   # "dir/file" -> [idx]  (gitignore: path or any parent)
+literal_any = {}        # "name"     -> [idx]  (gitignore: any path component)
+ext_map = {}            # "py"       -> [idx]
+complex_idx = []
+# The fnmatch fallback ignores case on Windows; fold keys and paths to match
+_FOLD = _PS is None and bool(_FN_FLAGS)
+for idx, (spec, patt, patt_norm, holder) in enumerate(compiled_patterns):
+    q = patt.replace("\\","/")
+    m = _EXT_RE.match(patt_norm)
+    if m and q == patt_norm:
+        ext_map.setdefault(m.group(1).lower() if _FOLD else m.group(1), []).append(idx)
+    elif _LITERAL_RE.match(patt_norm) and not (_PS and isinstance(spec, re.Pattern)):
+        if _PS is None or "/" in q:
+            literal_anchored.setdefault(patt_norm.lower() if _FOLD else patt_norm, []).append(idx)
+        else:
+            literal_any.setdefault(patt_norm, []).append(idx)
+    else:
+        complex_idx.append(idx)
+def _bucket_hits(norm):
+    hits = set()
+    if _PS is None:
+        # fnmatch semantics: literal equals the path, "*" also spans "/"
+        if _FOLD:
+            norm = norm.lower()
+        hits.update(literal_anchored.get(norm, ()))
+        if ext_map:
+            ext = norm.rpartition(".")[2] if "." in norm else None
+            hits.update(ext_map.get(ext, ()))
+        return hits
+    # gitignore semantics: a pattern matching a directory covers its contents
+    parts = norm.split("/")
+    prefix = ""
+    for part in parts:
+        prefix = f"{prefix}/{part}" if prefix else part
+        hits.update(literal_anchored.get(prefix, ()))
+        hits.update(literal_any.get(part, ()))
+        if ext_map and "." in part:
+            hits.update(ext_map.get(part.rpartition(".")[2], ()))
+    return hits
+
+# Phase 2b: Longest literal prefix shared by every pattern. Paths outside it
+# cannot match any reservation. Unanchored gitignore patterns (no "/") match
+# at any depth, so a single one of them disables pruning.
+def _literal_prefix(patt):
+    q = patt.replace("\\","/")
+    if q.startswith("!"):
+        return ""
+    if _PS is not None and "/" not in q.rstrip("/"):
+        return ""
+    return re.split(r"[*?\[\\]", q.lstrip("/"), 1)[0]
+common_prefix = ""
+if compiled_patterns and os.name != "nt":
+    common_prefix = os.path.commonprefix([_literal_prefix(c[1]) for c in compiled_patterns])
+
+# Phase 2c: Build one combined regex (one named group per pattern) so a
+# single scan finds the first matching reservation instead of re-matching
+# every spec. Only if that fails, fall back to a union PathSpec for
+# fast-path rejection.
 union_spec = None
-if _PS and all_pattern_strings:
+combined_re = None
+if complex_idx:
     try:
-        union_spec = _PS.from_lines("gitignore", all_pattern_strings)
+        alts = []
+        for idx in complex_idx:
+            spec = compiled_patterns[idx][0]
+            if isinstance(spec, re.Pattern):
+                src = f"(?i:{spec.pattern})" if spec.flags & re.IGNORECASE else spec.pattern
+                alts.append(f"(?P<p{idx}>{src})")
+                continue
+            for pat in spec.patterns:
+                if pat.include and pat.regex is not None:
+                    # Inner named groups would collide across alternatives
+                    src = re.sub(r"\(\?P<[^>]+>", "(?:", pat.regex.pattern)
+                    alts.append(f"(?P<p{idx}>{src})")
+        combined_re = re.compile("|".join(alts)) if alts else None
+    except Exception:
+        combined_re = None
+if combined_re is None and _PS and complex_idx:
+    try:
+        union_spec = _PS.from_lines("gitignore", [compiled_patterns[i][2] for i in complex_idx])
     except Exception:
         union_spec = None
 
+# Per-pattern regexes for attribution, so hits are confirmed with a direct
+# .match() rather than another PathSpec.match_file dispatch per pattern.
+spec_res = {}
+for idx in complex_idx:
+    spec = compiled_patterns[idx][0]
+    if isinstance(spec, re.Pattern):
+        spec_res[idx] = (spec,)
+    else:
+        spec_res[idx] = tuple(pat.regex for pat in spec.patterns
+                              if pat.include and pat.regex is not None)
+
 # Phase 3: Check paths against compiled patterns
 conflicts = []
+match_cache = {}
 if compiled_patterns:
     for p in paths:
-        norm = p.replace('\\','/').lstrip('/')
-        # Fast-path: if union_spec exists and path doesn't match ANY pattern, skip
-        if union_spec is not None and not union_spec.match_file(norm):
+        # Blocking mode fails on the first conflicting path; only advisory
+        # mode needs the full list
+        if conflicts and not ADVISORY:
+            break
+        # git already emits relative forward-slash paths; only rewrite when not
+        norm = p if ('\\' not in p and p[:1] != '/') else p.replace('\\','/').lstrip('/')
+        if common_prefix and not norm.startswith(common_prefix):
+            continue
+        cached = match_cache.get(norm)
+        if cached is not None:
+            conflicts.extend((compiled_patterns[idx][1], p, compiled_patterns[idx][3]) for idx in cached)
             continue
+        matched_idx = _bucket_hits(norm) if (literal_anchored or literal_any or ext_map) else set()
+        candidates = complex_idx
+        if combined_re is not None:
+            m = combined_re.match(norm)
+            # Everything before the first matching group is known not to match
+            start = int(m.lastgroup[1:]) if m is not None else None
+            candidates = [i for i in complex_idx if start is not None and i >= start]
+        # Fast-path: if union_spec exists and path doesn't match ANY pattern, skip
+        elif union_spec is not None and not union_spec.match_file(norm):
+            candidates = []
         # Detailed matching for conflict attribution
-        for spec, patt, patt_norm, holder in compiled_patterns:
-            matched = spec.match_file(norm) if spec is not None else _fn.fnmatch(norm, patt_norm)
-            if matched:
-                conflicts.append((patt, p, holder))
+        for idx in candidates:
+            if any(r.match(norm) for r in spec_res[idx]):
+                matched_idx.add(idx)
+        match_cache[norm] = sorted(matched_idx)
+        for idx in match_cache[norm]:
+            _spec, patt, _pn, holder = compiled_patterns[idx]
+            conflicts.append((patt, p, holder))
 if conflicts:
-    sys.stderr.write("Exclusive file_reservation conflicts detected\n")
-    for patt, path, holder in conflicts[:10]:
-        sys.stderr.write(f"- {path} matches {patt} (holder: {holder})\n")
+    lines = ["Exclusive file_reservation conflicts detected"]
+    lines.extend(f"- {path} matches {patt} (holder: {holder})" for patt, path, holder in conflicts[:10])
+    sys.stderr.write("\n".join(lines) + "\n")
     if ADVISORY:
         sys.exit(0)
     sys.exit(1)
+if clean_token is not None:
+    try:
+        tmp = CLEAN_MARKER.with_name(f"{CLEAN_MARKER.name}.{os.getpid()}.tmp")
+        tmp.write_text(clean_token, encoding="utf-8")
+        os.replace(tmp, CLEAN_MARKER)
+    except OSError:
+        pass
 sys.exit(0)
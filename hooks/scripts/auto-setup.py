@@ -3,13 +3,13 @@
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Add scripts/ to path so we can import lib
 scripts_dir = os.path.join(os.path.dirname(__file__), "..", "..", "scripts")
 sys.path.insert(0, os.path.abspath(scripts_dir))
 
 from lib import (
-    CODEMAN_PORT, DOLT_PORT, MAIL_PORT,
     check_codeman_installed, check_dolt_installed, check_mail_installed,
     check_mail_mcp, check_plugin, codeman_server_alive, command_exists,
     dolt_server_alive, log, mail_server_alive, marker_is_fresh,
@@ -17,47 +17,50 @@ from lib import (
 )
 
 
+# (label, installed, alive, start) — servers kept running on every session
+SERVERS = [
+    ("Agent Mail server", check_mail_installed, mail_server_alive, start_mail_server),
+    ("Dolt sql-server", check_dolt_installed, dolt_server_alive, start_dolt_server),
+    ("Codeman server", check_codeman_installed, codeman_server_alive, start_codeman),
+]
+
+# (label, check) — read-only install checks, no claude CLI calls
+TOOLS = [
+    ("Atlas", lambda: check_plugin("atlas")),
+    ("Relay", lambda: check_plugin("relay")),
+    ("Context7", lambda: check_plugin("context7")),
+    ("Serena", lambda: check_plugin("serena")),
+    ("Dolt (brew install dolt)", check_dolt_installed),
+    ("Beads", lambda: command_exists("bd") and check_plugin("beads")),
+    ("beads-ui", lambda: command_exists("bdui")),
+    ("Agent Mail", lambda: check_mail_installed() and check_mail_mcp()),
+    ("Codeman", check_codeman_installed),
+]
+
+
+def _ensure_server(installed, alive, start) -> bool:
+    return installed() and not alive() and start()
+
+
 def main():
-    # Always ensure mail server is running (if installed)
-    if check_mail_installed() and not mail_server_alive():
-        if start_mail_server():
-            log("Toolkit: Agent Mail server started")
-
-    # Always ensure Dolt sql-server is running (if installed)
-    if check_dolt_installed() and not dolt_server_alive():
-        if start_dolt_server():
-            log("Toolkit: Dolt sql-server started")
-
-    # Always ensure Codeman is running (if installed)
-    if check_codeman_installed() and not codeman_server_alive():
-        if start_codeman():
-            log("Toolkit: Codeman server started")
-
-    # Skip status check if marker is fresh
-    if marker_is_fresh():
+    # Status check is skipped while the marker is fresh
+    fresh = marker_is_fresh()
+
+    # Probes and server starts are independent and I/O-bound: run them
+    # concurrently, then report in table order.
+    with ThreadPoolExecutor(max_workers=len(SERVERS) + len(TOOLS)) as pool:
+        started = [pool.submit(_ensure_server, *srv[1:]) for srv in SERVERS]
+        checks = [] if fresh else [pool.submit(check) for _, check in TOOLS]
+
+    # Always ensure servers are running (if installed)
+    for (label, *_), fut in zip(SERVERS, started):
+        if fut.result():
+            log(f"Toolkit: {label} started")
+
+    if fresh:
         return
 
-    # Check what's installed vs missing (read-only, no claude CLI calls)
-    missing = []
-
-    if not check_plugin("atlas"):
-        missing.append("Atlas")
-    if not check_plugin("relay"):
-        missing.append("Relay")
-    if not check_plugin("context7"):
-        missing.append("Context7")
-    if not check_plugin("serena"):
-        missing.append("Serena")
-    if not check_dolt_installed():
-        missing.append("Dolt (brew install dolt)")
-    if not (command_exists("bd") and check_plugin("beads")):
-        missing.append("Beads")
-    if not command_exists("bdui"):
-        missing.append("beads-ui")
-    if not (check_mail_installed() and check_mail_mcp()):
-        missing.append("Agent Mail")
-    if not check_codeman_installed():
-        missing.append("Codeman")
+    missing = [label for (label, _), fut in zip(TOOLS, checks) if not fut.result()]
 
     if missing:
         log(f"Toolkit: missing tools: {', '.join(missing)}")
@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 """Batch project initialization — scan subdirectories for git repos and init each one."""
 
+import functools
 import json
 import os
 import re
 import sys
+import time
 
 sys.path.insert(0, os.path.dirname(__file__))
 from lib import (
     BOLD, CYAN, DIM, GREEN, RED, RESET, YELLOW,
-    MAIL_DIR, MAIL_PORT, check_mail_installed, check_mcp, check_plugin,
-    command_exists, detect_repo_host, extract_org_repo,
+    MAIL_DIR, MAIL_PORT, capture_output, check_mail_installed, check_mcp,
+    check_plugin, command_exists, detect_repo_host, extract_org_repo,
     git_remote_url, log, mail_server_alive, read_mail_token, run,
 )
 
@@ -32,52 +34,119 @@ for a in args:
 
 HOME = os.path.expanduser("~")
 SCAN_ROOT = os.getcwd()
+ATLAS_DIR = os.path.join(HOME, ".claude", "atlas")
+ATLAS_REGISTRY = os.path.join(ATLAS_DIR, "registry.yaml")
+ATLAS_CACHE_DIR = os.path.join(ATLAS_DIR, "cache", "projects")
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
+# Detection results are memoized per project_dir: the init_* steps for one repo
+# all ask the same questions, and nothing they write changes the answers.
 
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _slugify(name: str) -> str:
+    return _SLUG_RE.sub("-", name.lower()).strip("-")
+
+
+def _tilde(path: str) -> str:
+    """Abbreviate a leading home directory to ~, leaving the rest of path alone."""
+    if path == HOME or path.startswith(HOME + os.sep):
+        return "~" + path[len(HOME):]
+    return path
+
+
+@functools.lru_cache(maxsize=None)
 def _slug_from_dirname(path: str) -> str:
-    name = os.path.basename(os.path.abspath(path))
-    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
-    return slug
+    return _slugify(os.path.basename(os.path.abspath(path)))
+
+
+@functools.lru_cache(maxsize=None)
+def _dir_entries(path: str) -> dict[str, os.DirEntry]:
+    """Entries of path by name, from a single readdir (empty if unreadable).
+
+    A snapshot: only used for "already initialized" probes, each of which
+    runs before the step that would create its entry.
+    """
+    try:
+        with os.scandir(path) as it:
+            return {e.name: e for e in it}
+    except OSError:
+        return {}
 
 
+def _has_file(dirpath: str, name: str) -> bool:
+    e = _dir_entries(dirpath).get(name)
+    return e is not None and e.is_file()
+
+
+def _has_dir(dirpath: str, name: str) -> bool:
+    e = _dir_entries(dirpath).get(name)
+    return e is not None and e.is_dir()
+
+
+@functools.lru_cache(maxsize=None)
+def _top_level_files(project_dir: str) -> frozenset[str]:
+    """Names of regular files directly in project_dir."""
+    return frozenset(n for n, e in _dir_entries(project_dir).items() if e.is_file())
+
+
+# npm writes "name" as the first key; when it is, take it straight from the
+# first block instead of reading and parsing the whole manifest
+_PKG_NAME_RE = re.compile(rb'\A\s*\{\s*"name"\s*:\s*"([^"\\]+)"')
+
+
+@functools.lru_cache(maxsize=None)
 def _detect_project_name(project_dir: str) -> str:
     """Try package.json name, fallback to dirname."""
     pkg = os.path.join(project_dir, "package.json")
-    if os.path.isfile(pkg):
+    if "package.json" in _top_level_files(project_dir):
         try:
-            data = json.loads(open(pkg).read())
+            with open(pkg, "rb") as f:
+                blob = f.read(4096)
+                m = _PKG_NAME_RE.match(blob)
+                if m:
+                    return m.group(1).decode()
+                blob += f.read()
+            data = json.loads(blob)
             if data.get("name"):
                 return data["name"]
-        except (json.JSONDecodeError, OSError):
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
             pass
     return os.path.basename(os.path.abspath(project_dir))
 
 
-def _detect_tags(project_dir: str) -> list[str]:
+# Marker files (in the project root) → tag, checked in this order
+_TAG_MARKERS = (
+    (frozenset({"package.json", "tsconfig.json"}), "typescript"),
+    (frozenset({"Cargo.toml"}), "rust"),
+    (frozenset({"go.mod"}), "go"),
+    (frozenset({"build.gradle", "build.gradle.kts"}), "java"),
+    (frozenset({"requirements.txt", "pyproject.toml"}), "python"),
+    (frozenset({"build.sbt"}), "scala"),
+    (frozenset({"Gemfile"}), "ruby"),
+    (frozenset({"composer.json"}), "php"),
+    (frozenset({"Package.swift"}), "swift"),
+    (frozenset({"mix.exs"}), "elixir"),
+    (frozenset({"pubspec.yaml"}), "dart"),
+)
+_CPP_MARKERS = frozenset({"CMakeLists.txt", "Makefile"})  # only when nothing else matched
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_tags(project_dir: str) -> tuple[str, ...]:
     """Auto-detect project tags from files present."""
-    tags = []
-    checks = [
-        (["package.json", "tsconfig.json"], "typescript"),
-        (["Cargo.toml"], "rust"),
-        (["go.mod"], "go"),
-        (["build.gradle", "build.gradle.kts"], "java"),
-        (["requirements.txt", "pyproject.toml"], "python"),
-        (["build.sbt"], "scala"),
-        (["Gemfile"], "ruby"),
-        (["composer.json"], "php"),
-        (["Package.swift"], "swift"),
-        (["mix.exs"], "elixir"),
-        (["pubspec.yaml"], "dart"),
-    ]
-    for files, tag in checks:
-        if any(os.path.isfile(os.path.join(project_dir, f)) for f in files):
-            tags.append(tag)
-    if not tags:
-        if any(os.path.isfile(os.path.join(project_dir, f)) for f in ["CMakeLists.txt", "Makefile"]):
-            tags.append("cpp")
-    return tags
+    names = _top_level_files(project_dir)
+    tags = [tag for files, tag in _TAG_MARKERS if not files.isdisjoint(names)]
+    if not tags and not _CPP_MARKERS.isdisjoint(names):
+        tags.append("cpp")
+    return tuple(tags)
+
+
+@functools.lru_cache(maxsize=None)
+def _git_remote_url(project_dir: str) -> str | None:
+    return git_remote_url(project_dir)
 
 
 # Tag → Serena language name mapping
@@ -99,19 +168,57 @@ TAG_TO_SERENA = {
 }
 
 
-def _registry_has_slug(registry_path: str, slug: str) -> bool:
-    if not os.path.isfile(registry_path):
-        return False
-    content = open(registry_path).read()
-    return bool(re.search(rf"^  {re.escape(slug)}:", content, re.M))
+_REGISTRY_SLUG_RE = re.compile(rb"^  ([^\s:]+):", re.M)
 
 
-def _registry_has_path(registry_path: str, path: str) -> bool:
-    if not os.path.isfile(registry_path):
-        return False
-    content = open(registry_path).read()
-    tilde_path = path.replace(HOME, "~")
-    return tilde_path in content or path in content
+def _load_registry(registry_path: str) -> dict:
+    """Read the Atlas registry once: raw bytes for path lookups, slugs as a set.
+
+    init_atlas keeps both up to date and queues new entries in "pending", so
+    a batch run never re-reads the file and appends to it once, via
+    _flush_registry.
+    """
+    try:
+        with open(registry_path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        blob = b""
+    return {
+        "path": registry_path,
+        "blob": blob,
+        "slugs": {s.decode("utf-8", "replace") for s in _REGISTRY_SLUG_RE.findall(blob)},
+        "pending": [],
+    }
+
+
+def _prepare_atlas() -> dict:
+    """Create the Atlas cache dir and registry file if needed; load the registry."""
+    os.makedirs(ATLAS_CACHE_DIR, exist_ok=True)
+    try:
+        with open(ATLAS_REGISTRY, "x") as f:
+            f.write("# Atlas project registry\n\nprojects:\n")
+    except FileExistsError:
+        pass
+    return _load_registry(ATLAS_REGISTRY)
+
+
+def _flush_registry(registry: dict):
+    """Append the entries queued by init_atlas to the registry in one write."""
+    if not registry["pending"]:
+        return
+    with open(registry["path"], "a") as f:
+        f.write("".join(registry["pending"]))
+    registry["pending"].clear()
+
+
+def _registry_has_slug(registry: dict, slug: str) -> bool:
+    return slug in registry["slugs"]
+
+
+def _registry_has_path(registry: dict, path: str) -> bool:
+    tilde_path = _tilde(path)
+    blob = registry["blob"]
+    return tilde_path.encode() in blob or path.encode() in blob
 
 
 # ── Scan for git repos ───────────────────────────────────────────────────────
@@ -138,6 +245,10 @@ def read_project_mode(project_dir: str) -> str:
     return "normal"
 
 
+# Never descended into (dot-directories are skipped separately)
+_SKIP_DIRS = frozenset({"node_modules", "vendor", "__pycache__"})
+
+
 def find_git_repos(root: str, max_depth: int) -> list[str]:
     """Find directories containing .git/ up to max_depth levels deep.
 
@@ -145,32 +256,45 @@ def find_git_repos(root: str, max_depth: int) -> list[str]:
     (filtered later in the init loop).
     """
     repos = []
-
-    def _scan(path: str, depth: int):
-        if depth > max_depth:
-            return
+    # Depth-first with an explicit stack; children are pushed in reverse so
+    # they pop (and repos come out) in sorted order
+    stack = [(root, 0)] if max_depth >= 0 else []
+    while stack:
+        path, depth = stack.pop()
+        # One readdir per directory; DirEntry.is_dir() uses d_type, so
+        # entries need no separate stat/lstat
+        is_repo = False
+        subdirs = []
         try:
-            entries = sorted(os.listdir(path))
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    if name == ".git":
+                        if entry.is_dir():
+                            is_repo = True
+                            break
+                    elif name.startswith(".") or name in _SKIP_DIRS:
+                        continue
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
         except PermissionError:
-            return
+            continue
 
-        if ".git" in entries and os.path.isdir(os.path.join(path, ".git")):
+        if is_repo:
             if read_project_mode(path) != "ignore":
                 repos.append(path)
-            return  # Don't scan inside a git repo for nested repos
+            continue  # Don't scan inside a git repo for nested repos
 
-        for entry in entries:
-            if entry.startswith(".") or entry == "node_modules" or entry == "vendor":
-                continue
-            full = os.path.join(path, entry)
-            if os.path.isdir(full) and not os.path.islink(full):
-                _scan(full, depth + 1)
+        if depth < max_depth:
+            subdirs.sort(reverse=True)
+            stack.extend((full, depth + 1) for full in subdirs)
 
-    _scan(root, 0)
     return repos
 
 
 # ── Per-project init functions ───────────────────────────────────────────────
+# Each init_* assumes its tool is available: main() checks that once per batch
+# and only calls the steps it found, rather than re-probing for every repo.
 
 
 def _git_exclude_add(project_dir: str, pattern: str):
@@ -191,41 +315,48 @@ def _git_exclude_add(project_dir: str, pattern: str):
         f.write(f"{pattern}\n")
 
 
-def init_atlas(project_dir: str, readonly: bool = False):
+def init_atlas(
+    project_dir: str,
+    readonly: bool = False,
+    registry: dict | None = None,
+    cached_at: str | None = None,
+):
     """Register project in Atlas.
 
     Args:
         readonly: If True, still write .claude/atlas.yaml but add it to
                   .git/info/exclude so it never shows in git status or gets pushed.
+        registry: In-memory registry from _prepare_atlas, shared across a
+                  batch. New entries are only queued on it; the caller
+                  writes them with _flush_registry. When omitted, the
+                  registry is prepared here and the entry written at once.
+        cached_at: Timestamp for the cache entry; a batch stamps every repo
+                   with the same one. Defaults to now.
     """
-    if not check_plugin("atlas"):
-        return False
-
-    atlas_dir = os.path.join(HOME, ".claude", "atlas")
-    registry_path = os.path.join(atlas_dir, "registry.yaml")
-    cache_dir = os.path.join(atlas_dir, "cache", "projects")
     project_config = os.path.join(project_dir, ".claude", "atlas.yaml")
 
-    os.makedirs(cache_dir, exist_ok=True)
-
-    if not os.path.isfile(registry_path):
-        with open(registry_path, "w") as f:
-            f.write("# Atlas project registry\n\nprojects:\n")
+    standalone = registry is None
+    if standalone:
+        registry = _prepare_atlas()
 
-    if _registry_has_path(registry_path, project_dir):
+    if _registry_has_path(registry, project_dir):
         return True  # Already registered
 
     name = _detect_project_name(project_dir)
     slug = _slug_from_dirname(project_dir)
-    remote = git_remote_url(project_dir)
+    remote = _git_remote_url(project_dir)
     tags = _detect_tags(project_dir)
 
-    if _registry_has_slug(registry_path, slug):
+    if _registry_has_slug(registry, slug):
         slug = slug + "-2"
 
     # Write .claude/atlas.yaml if missing
-    os.makedirs(os.path.join(project_dir, ".claude"), exist_ok=True)
-    if not os.path.isfile(project_config):
+    if not _has_dir(project_dir, ".claude"):
+        os.makedirs(os.path.join(project_dir, ".claude"), exist_ok=True)
+    # Keep the content in hand either way; the cache below copies it
+    if _has_file(os.path.join(project_dir, ".claude"), "atlas.yaml"):
+        yaml_content = open(project_config).read()
+    else:
         tags_str = ", ".join(tags) if tags else ""
         yaml_content = f"name: {name}\nsummary: \"Initialized by toolkit\"\n"
         if tags_str:
@@ -238,43 +369,56 @@ def init_atlas(project_dir: str, readonly: bool = False):
         _git_exclude_add(project_dir, ".claude/")
 
     # Add to registry
-    tilde_path = project_dir.replace(HOME, "~")
+    tilde_path = _tilde(project_dir)
     entry = f"  {slug}:\n    path: {tilde_path}\n"
     if remote:
         entry += f"    repo: {remote}\n"
-    with open(registry_path, "a") as f:
-        f.write(entry)
+    registry["blob"] += entry.encode()
+    registry["slugs"].add(slug)
+    registry["pending"].append(entry)
+    if standalone:
+        _flush_registry(registry)
 
     # Cache
-    import time
-    cache_file = os.path.join(cache_dir, f"{slug}.yaml")
+    if cached_at is None:
+        cached_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    cache_file = os.path.join(ATLAS_CACHE_DIR, f"{slug}.yaml")
     meta = (
         f"_cache_meta:\n"
         f"  source: {project_config}\n"
-        f"  cached_at: \"{time.strftime('%Y-%m-%dT%H:%M:%S')}\"\n"
+        f"  cached_at: \"{cached_at}\"\n"
     )
     if remote:
         meta += f"  repo: {remote}\n"
     meta += "\n"
     with open(cache_file, "w") as f:
-        f.write(meta)
-        f.write(open(project_config).read())
+        f.write(meta + yaml_content)
 
     return True
 
 
-def init_relay(project_dir: str):
-    if not check_plugin("relay"):
-        return False
+def _render_tracker(t: dict) -> str:
+    """One issue_trackers list item of relay.yaml."""
+    out = f"  - name: {t['name']}\n    type: {t['type']}\n"
+    if t.get("default"):
+        out += "    default: true\n"
+    if t.get("repo"):
+        out += f'    repo: "{t["repo"]}"\n'
+    if t.get("project_id"):
+        out += f'    project_id: "{t["project_id"]}"\n'
+    if t.get("scope"):
+        out += f"    scope: {t['scope']}\n"
+    return out
+
 
+def init_relay(project_dir: str, has_beads: bool):
     relay_config = os.path.join(project_dir, ".claude", "relay.yaml")
-    if os.path.isfile(relay_config):
+    if _has_file(os.path.join(project_dir, ".claude"), "relay.yaml"):
         return True  # Already configured
 
-    remote = git_remote_url(project_dir)
+    remote = _git_remote_url(project_dir)
     host = detect_repo_host(remote) if remote else None
     org_repo = extract_org_repo(remote) if remote else None
-    has_beads = command_exists("bd")
 
     trackers = []
     if host and org_repo:
@@ -293,34 +437,20 @@ def init_relay(project_dir: str):
         return False
 
     os.makedirs(os.path.join(project_dir, ".claude"), exist_ok=True)
-    lines = ["issue_trackers:"]
-    for t in trackers:
-        lines.append(f"  - name: {t['name']}")
-        lines.append(f"    type: {t['type']}")
-        if t.get("default"):
-            lines.append("    default: true")
-        if t.get("repo"):
-            lines.append(f'    repo: "{t["repo"]}"')
-        if t.get("project_id"):
-            lines.append(f'    project_id: "{t["project_id"]}"')
-        if t.get("scope"):
-            lines.append(f"    scope: {t['scope']}")
-
+    body = "issue_trackers:\n" + "".join(_render_tracker(t) for t in trackers)
     with open(relay_config, "w") as f:
-        f.write("\n".join(lines) + "\n")
+        f.write(body)
 
     return True
 
 
 def init_beads(project_dir: str):
-    if not command_exists("bd"):
-        return False
-    if os.path.isdir(os.path.join(project_dir, ".beads")):
+    if _has_dir(project_dir, ".beads"):
         return True  # Already initialized
 
     name = _detect_project_name(project_dir)
-    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
-    return bool(run(f'cd "{project_dir}" && bd init --quiet {slug}'))
+    slug = _slugify(name)
+    return bool(run(["bd", "init", "--quiet", *([slug] if slug else [])], cwd=project_dir))
 
 
 def _pre_commit_has_guard(project_dir: str) -> bool:
@@ -339,8 +469,9 @@ def _pre_commit_has_guard(project_dir: str) -> bool:
         if not os.path.isfile(path):
             continue
         try:
-            content = open(path).read()
-            if "agent-mail" in content or "agent_mail" in content:
+            with open(path, "rb") as f:
+                content = f.read()
+            if b"agent-mail" in content or b"agent_mail" in content:
                 return True
         except OSError:
             pass
@@ -389,9 +520,6 @@ def _ensure_mail_project(project_dir: str) -> bool:
 
 
 def init_agent_mail(project_dir: str):
-    if not check_mail_installed() or not mail_server_alive():
-        return False
-
     if _pre_commit_has_guard(project_dir):
         return True  # Already installed
 
@@ -401,56 +529,54 @@ def init_agent_mail(project_dir: str):
         return False
 
     run(
-        f'cd {MAIL_DIR} && uv run python -m mcp_agent_mail.cli guard install '
-        f'"{project_dir}" "{project_dir}"'
+        ["uv", "run", "python", "-m", "mcp_agent_mail.cli", "guard", "install",
+         project_dir, project_dir],
+        cwd=MAIL_DIR,
     )
     # Verify the guard was actually written (command may silently skip)
     return _pre_commit_has_guard(project_dir)
 
 
-def init_serena(project_dir: str):
-    if not check_plugin("serena"):
-        return False
+_SERENA_PROJECT_YML = """\
+project_name: "{name}"
+languages:
+{languages}
+encoding: "utf-8"
+ignore_all_files_in_gitignore: true
+ignored_paths: []
+read_only: false
+excluded_tools: []
+included_optional_tools: []
+fixed_tools: []
+base_modes:
+default_modes:
+initial_prompt: ""
+symbol_info_budget:
+"""
 
-    project_yml = os.path.join(project_dir, ".serena", "project.yml")
-    if os.path.isfile(project_yml):
-        return True  # Already exists
+
+def init_serena(project_dir: str):
+    serena_dir = os.path.join(project_dir, ".serena")
+    project_yml = os.path.join(serena_dir, "project.yml")
 
     tags = _detect_tags(project_dir)
-    languages = []
-    for tag in tags:
-        lang = TAG_TO_SERENA.get(tag)
-        if lang and lang not in languages:
-            languages.append(lang)
+    # typescript and javascript both map to typescript; keep first-seen order
+    languages = list(dict.fromkeys(TAG_TO_SERENA[t] for t in tags if t in TAG_TO_SERENA))
 
     if not languages:
-        return False
+        return _has_file(serena_dir, "project.yml")  # Already exists, or nothing to do
 
-    name = _detect_project_name(project_dir)
-    serena_dir = os.path.join(project_dir, ".serena")
     os.makedirs(serena_dir, exist_ok=True)
-
-    lines = [
-        f'project_name: "{name}"',
-        "languages:",
-    ]
-    for lang in languages:
-        lines.append(f"- {lang}")
-    lines += [
-        'encoding: "utf-8"',
-        "ignore_all_files_in_gitignore: true",
-        "ignored_paths: []",
-        "read_only: false",
-        "excluded_tools: []",
-        "included_optional_tools: []",
-        "fixed_tools: []",
-        "base_modes:",
-        "default_modes:",
-        'initial_prompt: ""',
-        "symbol_info_budget:",
-    ]
-    with open(project_yml, "w") as f:
-        f.write("\n".join(lines) + "\n")
+    # O_EXCL makes the create itself the "already exists" check
+    try:
+        fd = os.open(project_yml, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except FileExistsError:
+        return True  # Already exists
+    with os.fdopen(fd, "w") as f:
+        f.write(_SERENA_PROJECT_YML.format(
+            name=_detect_project_name(project_dir),
+            languages="\n".join(f"- {lang}" for lang in languages),
+        ))
 
     gitignore = os.path.join(serena_dir, ".gitignore")
     if not os.path.isfile(gitignore):
@@ -461,11 +587,7 @@ def init_serena(project_dir: str):
 
 
 def init_bmad(project_dir: str):
-    if SKIP_BMAD:
-        return False
-    if not command_exists("npx"):
-        return False
-    if os.path.isdir(os.path.join(project_dir, "_bmad")):
+    if _has_dir(project_dir, "_bmad"):
         return True  # Already installed
     return bool(run(
         f'npx bmad-method install'
@@ -480,6 +602,46 @@ def init_bmad(project_dir: str):
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 
+# Summary column order for a repo's steps
+_STEP_ORDER = ("atlas", "relay", "beads", "mail", "serena", "bmad")
+
+
+def _init_hooks(repo_path: str, tools: list[str]) -> dict:
+    """Beads, then the mail guard: guard install targets the hook runner bd init sets up."""
+    status = {}
+    if "beads" in tools:
+        status["beads"] = init_beads(repo_path)
+    if "mail-guard" in tools:
+        status["mail"] = init_agent_mail(repo_path)
+    return status
+
+
+def _init_configs(repo_path: str, tools: list[str]) -> dict:
+    """Relay and Serena: file writes, independent of each other and of the hooks."""
+    status = {}
+    if "relay" in tools:
+        status["relay"] = init_relay(repo_path, "beads" in tools)
+    if "serena" in tools:
+        status["serena"] = init_serena(repo_path)
+    return status
+
+
+def _init_installers(repo_path: str, tools: list[str]) -> dict:
+    """BMAD: npx installs share npm's cache and are heavy, so run one repo at a time."""
+    status = {}
+    if "bmad" in tools:
+        status["bmad"] = init_bmad(repo_path)
+    return status
+
+
+def _run_lane(lane, repo_path: str, tools: list[str]) -> tuple[dict, list[str]]:
+    """Run one pooled lane with its output held back, for printing in repo order."""
+    lines = []
+    with capture_output(lines):
+        status = lane(repo_path, tools)
+    return status, lines
+
+
 def main():
     log()
     log(f"  {BOLD}Project Init — Batch Scanner{RESET}")
@@ -505,7 +667,7 @@ def main():
     has_atlas = check_plugin("atlas")
     has_relay = check_plugin("relay")
     has_beads = command_exists("bd")
-    has_mail = check_mail_installed() and mail_server_alive()
+    has_mail = check_mail_installed() and mail_server_alive(deep=True)
     has_serena = check_plugin("serena")
     has_bmad = command_exists("npx") and not SKIP_BMAD
 
@@ -539,7 +701,12 @@ def main():
     log()
 
     results = []
+    pending = []
+    registry = _prepare_atlas() if "atlas" in tools else None
+    cached_at = time.strftime("%Y-%m-%dT%H:%M:%S")
 
+    # Atlas appends to one shared registry and hands out "-2" slugs on a
+    # first-come basis, so it runs here in scan order
     for repo_path in repos:
         rel = os.path.relpath(repo_path, SCAN_ROOT)
         mode = read_project_mode(repo_path)
@@ -548,24 +715,49 @@ def main():
         if mode == "readonly":
             # Readonly: Atlas with local exclude, skip everything else
             if has_atlas and not RELAY_ONLY:
-                status["atlas"] = init_atlas(repo_path, readonly=True)
+                status["atlas"] = init_atlas(
+                    repo_path, readonly=True, registry=registry, cached_at=cached_at)
         else:
             # Normal mode: full init
             if has_atlas and not RELAY_ONLY:
-                status["atlas"] = init_atlas(repo_path)
-            if has_relay and not ATLAS_ONLY:
-                status["relay"] = init_relay(repo_path)
-            if has_beads:
-                status["beads"] = init_beads(repo_path)
-            if has_mail:
-                status["mail"] = init_agent_mail(repo_path)
-            if has_serena:
-                status["serena"] = init_serena(repo_path)
-            if has_bmad:
-                status["bmad"] = init_bmad(repo_path)
+                status["atlas"] = init_atlas(repo_path, registry=registry, cached_at=cached_at)
+            pending.append((repo_path, status))
 
         results.append((rel, mode, status))
 
+    if registry is not None:
+        _flush_registry(registry)
+
+    # The remaining steps touch only their own repo and are mostly file I/O
+    # or a subprocess (bd init, guard install), so overlap them: both lanes
+    # of every repo run side by side. Only these pooled lanes have their
+    # output held back; it is printed per repo, in scan order. The BMAD
+    # install stays serial, one repo at a time on this thread as each
+    # repo's lanes finish, and streams its output live. An Atlas-only run
+    # has none and never loads the thread pool machinery.
+    if pending and any(t != "atlas" for t in tools):
+        from concurrent.futures import ThreadPoolExecutor
+        shown = False
+        with ThreadPoolExecutor(max_workers=min(8, 2 * len(pending))) as pool:
+            lanes = [
+                (repo_path, status,
+                 pool.submit(_run_lane, _init_hooks, repo_path, tools),
+                 pool.submit(_run_lane, _init_configs, repo_path, tools))
+                for repo_path, status in pending
+            ]
+            for repo_path, status, hooks, configs in lanes:
+                (hooks_done, hooks_out), (configs_done, configs_out) = hooks.result(), configs.result()
+                out = hooks_out + configs_out
+                if out or "bmad" in tools:
+                    log(f"  {DIM}{os.path.relpath(repo_path, SCAN_ROOT)}{RESET}")
+                    if out:
+                        log("\n".join(out))
+                    shown = True
+                done = {**hooks_done, **configs_done, **_init_installers(repo_path, tools)}
+                status.update((k, done[k]) for k in _STEP_ORDER if k in done)
+        if shown:
+            log()
+
     # Summary table
     log(f"  {BOLD}Results{RESET}")
     log(f"  {'─' * 60}")
@@ -1,78 +1,234 @@
 """Shared helpers for toolkit scripts. Stdlib only, zero external deps."""
 
+import contextlib
+import functools
 import json
 import os
 import re
 import shutil
 import subprocess
 import sys
+import threading
+import time
+
+_HOME = os.path.expanduser("~")
 
 # ── Colors ────────────────────────────────────────────────────────────────────
 
-_NO_COLOR = os.environ.get("NO_COLOR") or not sys.stdout.isatty()
+# GREEN, DIM, ... are resolved on first import by name (see __getattr__), so
+# modules that never style output, like the SessionStart hook, skip the
+# isatty probe.
+
+_COLOR_CODES = {
+    "GREEN": "\033[32m",
+    "DIM": "\033[90m",
+    "YELLOW": "\033[33m",
+    "CYAN": "\033[36m",
+    "RED": "\033[31m",
+    "BOLD": "\033[1m",
+    "RESET": "\033[0m",
+}
+
+
+@functools.cache
+def _no_color() -> bool:
+    return bool(os.environ.get("NO_COLOR")) or not sys.stdout.isatty()
 
-GREEN = "" if _NO_COLOR else "\033[32m"
-DIM = "" if _NO_COLOR else "\033[90m"
-YELLOW = "" if _NO_COLOR else "\033[33m"
-CYAN = "" if _NO_COLOR else "\033[36m"
-RED = "" if _NO_COLOR else "\033[31m"
-BOLD = "" if _NO_COLOR else "\033[1m"
-RESET = "" if _NO_COLOR else "\033[0m"
+
+def __getattr__(name: str) -> str:
+    code = _COLOR_CODES.get(name)
+    if code is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = "" if _no_color() else code
+    return value
 
 # ── Logging ───────────────────────────────────────────────────────────────────
 
 
+_capture = threading.local()
+
+
 def log(msg=""):
-    print(msg)
+    lines = getattr(_capture, "lines", None)
+    if lines is None:
+        print(msg)
+    else:
+        lines.append(str(msg))
+
+
+@contextlib.contextmanager
+def capture_output(lines: list[str]):
+    """Collect this thread's log() lines and run() output in lines instead of
+    printing them, so concurrent work can be reported in a fixed order.
+
+    Meant for short steps on pool threads only: a command run under it gets
+    no stdin and shows nothing until it exits, so keep installers and other
+    long or interactive commands outside.
+    """
+    _capture.lines = lines
+    try:
+        yield lines
+    finally:
+        _capture.lines = None
 
 
 # ── Command helpers ───────────────────────────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=None)
 def command_exists(cmd: str) -> bool:
     return shutil.which(cmd) is not None
 
 
-def run(cmd: str, timeout: int = 60, **kwargs) -> bool:
-    """Run command with inherited stdio. Returns True on success."""
+def run(cmd: str | list[str], timeout: int = 60, **kwargs) -> bool:
+    """Run command with inherited stdio. Returns True on success.
+
+    A string goes through the shell; an argv list is executed directly
+    (pass cwd= instead of a "cd ... &&" prefix). Under capture_output() the
+    command gets no stdin and its combined output is collected with the log.
+    """
+    shown = cmd if isinstance(cmd, str) else " ".join(cmd)
+    lines = getattr(_capture, "lines", None)
+    if lines is not None:
+        kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.PIPE,
+                  "stderr": subprocess.STDOUT, **kwargs}
+
+    def _collect(out):
+        if lines is not None and out:
+            lines.extend(out.decode("utf-8", "replace").splitlines())
+
     try:
-        subprocess.run(cmd, shell=True, check=True, timeout=timeout, **kwargs)
-        return True
-    except subprocess.TimeoutExpired:
-        log(f"  Warning: command timed out ({timeout}s): {cmd}")
+        r = subprocess.run(cmd, shell=isinstance(cmd, str), check=True, timeout=timeout, **kwargs)
+    except subprocess.TimeoutExpired as e:
+        _collect(e.output)
+        log(f"  Warning: command timed out ({timeout}s): {shown}")
+        return False
+    except subprocess.CalledProcessError as e:
+        _collect(e.output)
+        log(f"  Warning: command failed: {shown}")
         return False
-    except subprocess.CalledProcessError:
-        log(f"  Warning: command failed: {cmd}")
+    except OSError:
+        log(f"  Warning: command failed: {shown}")
         return False
+    _collect(r.stdout)
+    return True
+
+
+def _wait_until(pred, timeout: float = 6.0) -> bool:
+    """Poll pred() with exponential backoff (50ms doubling to 500ms) until it
+    returns True or timeout seconds pass. Returns the last result."""
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    return pred()
 
 
-def run_capture(cmd: str, timeout: int = 10) -> str | None:
-    """Run command and return stdout, or None on failure/timeout."""
+def run_capture(cmd: str | list[str], timeout: int = 10, **kwargs) -> str | None:
+    """Run command and return stdout, or None on failure/timeout.
+
+    Like run(), a string goes through the shell and an argv list does not.
+    """
     try:
         r = subprocess.run(
-            cmd, shell=True, check=True, capture_output=True, text=True,
-            timeout=timeout,
+            cmd, shell=isinstance(cmd, str), check=True, capture_output=True,
+            text=True, timeout=timeout, **kwargs,
         )
         return r.stdout
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
         return None
 
 
+def _port_open(host: str, port: int, timeout: float = 0.2) -> bool:
+    """Check if something accepts TCP connections on host:port."""
+    import socket
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _http_ok(url: str) -> bool:
+    """Check if a GET on url succeeds."""
+    import urllib.request
+    import urllib.error
+    try:
+        urllib.request.urlopen(urllib.request.Request(url), timeout=2)
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def _spawn_server(argv: list[str], cwd: str, log_path: str, alive) -> bool:
+    """Start a server detached from this session, logging to log_path, and
+    wait for alive() to report it up."""
+    log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        subprocess.Popen(
+            argv,
+            cwd=cwd,
+            stdout=log_fd,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    finally:
+        os.close(log_fd)  # the child has its own copy
+    return _wait_until(alive)
+
+
+def probe_all(checks: dict) -> dict:
+    """Run independent checks concurrently; return {key: bool} in input order.
+
+    Each check is an I/O-bound callable (config read, PATH lookup, TCP probe).
+    A check that raises counts as False.
+    """
+    def _safe(check) -> bool:
+        try:
+            return bool(check())
+        except Exception:
+            return False
+
+    if len(checks) < 2:
+        return {k: _safe(v) for k, v in checks.items()}
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(8, len(checks))) as pool:
+        futures = {k: pool.submit(_safe, v) for k, v in checks.items()}
+    return {k: f.result() for k, f in futures.items()}
+
+
 # ── Claude config paths ──────────────────────────────────────────────────────
 
-_CLAUDE_DIR = os.path.join(os.path.expanduser("~"), ".claude")
+_CLAUDE_DIR = os.path.join(_HOME, ".claude")
 _PLUGINS_JSON = os.path.join(_CLAUDE_DIR, "plugins", "installed_plugins.json")
 _SETTINGS_JSON = os.path.join(_CLAUDE_DIR, "settings.json")
-_CLAUDE_JSON = os.path.join(os.path.expanduser("~"), ".claude.json")
+_CLAUDE_JSON = os.path.join(_HOME, ".claude.json")
 _MARKETPLACES_JSON = os.path.join(_CLAUDE_DIR, "plugins", "known_marketplaces.json")
 
 
 def _read_json(path: str) -> dict:
-    """Read a JSON file, returning empty dict on any failure."""
+    """Read a JSON file, returning empty dict on any failure.
+
+    Parsed results are cached per (path, mtime), so repeated checks against
+    the same config decode it once while a rewrite (e.g. by `claude plugin
+    install`) is picked up on the next call. Callers must not mutate the result.
+    """
     try:
-        with open(path) as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    return _read_json_cached(path, mtime)
+
+
+@functools.lru_cache(maxsize=16)
+def _read_json_cached(path: str, mtime: int) -> dict:
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):  # ValueError covers JSONDecodeError and bad UTF-8
         return {}
 
 
@@ -99,47 +255,57 @@ def check_plugin(name: str) -> bool:
     return any(needle in key.lower() for key in plugins)
 
 
-def check_marketplace(name: str) -> bool:
-    """Check if a marketplace is registered (reads known_marketplaces.json directly)."""
-    data = _read_json(_MARKETPLACES_JSON)
-    needle = name.lower()
+@functools.lru_cache(maxsize=4)
+def _marketplace_index(mtime: int) -> tuple[tuple[str, str], ...]:
+    """Lowercased (name, source repo or url) per known marketplace."""
+    data = _read_json_cached(_MARKETPLACES_JSON, mtime)
+    index = []
     for key, val in data.items():
-        if needle in key.lower():
-            return True
-        # Also check source repo field (e.g. "steveyegge/beads")
+        # Also match on the source repo field (e.g. "steveyegge/beads")
         repo = (val.get("source", {}).get("repo", "") or
                 val.get("source", {}).get("url", ""))
-        if needle in repo.lower():
-            return True
-    return False
+        index.append((key.lower(), repo.lower()))
+    return tuple(index)
+
+
+def check_marketplace(name: str) -> bool:
+    """Check if a marketplace is registered (reads known_marketplaces.json directly)."""
+    try:
+        mtime = os.stat(_MARKETPLACES_JSON).st_mtime_ns
+    except OSError:
+        return False
+    needle = name.lower()
+    return any(needle in key or needle in repo for key, repo in _marketplace_index(mtime))
 
 
 # ── Serena config ─────────────────────────────────────────────────────────────
 
+_SERENA_DASHBOARD_RE = re.compile(r"^web_dashboard_open_on_launch:\s*true\s*$", re.M)
+
 
 def configure_serena():
-    config_path = os.path.join(os.path.expanduser("~"), ".serena", "serena_config.yml")
-    if not os.path.isfile(config_path):
-        return
+    config_path = os.path.join(_HOME, ".serena", "serena_config.yml")
     try:
-        content = open(config_path).read()
-        if re.search(r"^web_dashboard_open_on_launch:\s*true\s*$", content, re.M):
-            content = re.sub(
-                r"^web_dashboard_open_on_launch:\s*true\s*$",
-                "web_dashboard_open_on_launch: false",
-                content,
-                flags=re.M,
-            )
-            with open(config_path, "w") as f:
-                f.write(content)
-            log("  Configured Serena: web_dashboard_open_on_launch = false")
+        with open(config_path) as f:
+            content, n = _SERENA_DASHBOARD_RE.subn(
+                "web_dashboard_open_on_launch: false", f.read())
+        if not n:
+            return
+        # Write beside the original and swap it in, so Serena (which may be
+        # running) never reads a half-written config
+        tmp_path = config_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        shutil.copymode(config_path, tmp_path)
+        os.replace(tmp_path, config_path)
+        log("  Configured Serena: web_dashboard_open_on_launch = false")
     except OSError:
         pass
 
 
 # ── Agent Mail helpers ────────────────────────────────────────────────────────
 
-MAIL_DIR = os.path.join(os.path.expanduser("~"), ".mcp_agent_mail")
+MAIL_DIR = os.path.join(_HOME, ".mcp_agent_mail")
 MAIL_TOKEN_FILE = os.path.join(MAIL_DIR, ".auth_token")
 MAIL_PORT = 8765
 
@@ -155,10 +321,21 @@ def check_mail_mcp() -> bool:
 
 
 def read_mail_token() -> str | None:
-    """Read the stored auth token."""
-    if os.path.isfile(MAIL_TOKEN_FILE):
-        return open(MAIL_TOKEN_FILE).read().strip()
-    return None
+    """Read the stored auth token (cached until the file changes)."""
+    try:
+        mtime = os.stat(MAIL_TOKEN_FILE).st_mtime_ns
+    except OSError:
+        return None
+    return _read_mail_token_cached(mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_mail_token_cached(mtime: int) -> str | None:
+    try:
+        with open(MAIL_TOKEN_FILE) as f:
+            return f.read(4096).strip()
+    except OSError:
+        return None
 
 
 def generate_mail_token() -> str:
@@ -167,16 +344,14 @@ def generate_mail_token() -> str:
     return secrets.token_hex(32)
 
 
-def mail_server_alive() -> bool:
-    """Check if the mail server is responding."""
-    import urllib.request
-    import urllib.error
-    try:
-        req = urllib.request.Request(f"http://localhost:{MAIL_PORT}/health/liveness")
-        urllib.request.urlopen(req, timeout=2)
-        return True
-    except (urllib.error.URLError, OSError):
+def mail_server_alive(deep: bool = False) -> bool:
+    """Check if the mail server is accepting connections.
+
+    deep=True also requires its HTTP liveness endpoint to answer.
+    """
+    if not _port_open("localhost", MAIL_PORT):
         return False
+    return not deep or _http_ok(f"http://localhost:{MAIL_PORT}/health/liveness")
 
 
 def start_mail_server() -> bool:
@@ -185,26 +360,15 @@ def start_mail_server() -> bool:
         return True
     if not check_mail_installed():
         return False
-    import time
-    pid_file = os.path.join(MAIL_DIR, ".server.pid")
-    subprocess.Popen(
+    return _spawn_server(
         ["uv", "run", "python", "-m", "mcp_agent_mail.cli", "serve-http"],
-        cwd=MAIL_DIR,
-        stdout=open(os.path.join(MAIL_DIR, "server.log"), "a"),
-        stderr=subprocess.STDOUT,
-        start_new_session=True,
+        MAIL_DIR, os.path.join(MAIL_DIR, "server.log"), mail_server_alive,
     )
-    # Wait briefly for startup
-    for _ in range(6):
-        time.sleep(1)
-        if mail_server_alive():
-            return True
-    return False
 
 
 # ── Codeman helpers ──────────────────────────────────────────────────────────
 
-CODEMAN_DIR = os.path.join(os.path.expanduser("~"), ".codeman", "app")
+CODEMAN_DIR = os.path.join(_HOME, ".codeman", "app")
 CODEMAN_PORT = 3000
 
 
@@ -215,15 +379,8 @@ def check_codeman_installed() -> bool:
 
 
 def codeman_server_alive() -> bool:
-    """Check if Codeman web UI is responding."""
-    import urllib.request
-    import urllib.error
-    try:
-        req = urllib.request.Request(f"http://localhost:{CODEMAN_PORT}/")
-        urllib.request.urlopen(req, timeout=2)
-        return True
-    except (urllib.error.URLError, OSError):
-        return False
+    """Check if Codeman web UI is accepting connections."""
+    return _port_open("localhost", CODEMAN_PORT)
 
 
 def start_codeman() -> bool:
@@ -232,19 +389,10 @@ def start_codeman() -> bool:
         return True
     if not check_codeman_installed():
         return False
-    import time
-    subprocess.Popen(
+    return _spawn_server(
         ["node", "dist/index.js", "web"],
-        cwd=CODEMAN_DIR,
-        stdout=open(os.path.join(CODEMAN_DIR, "server.log"), "a"),
-        stderr=subprocess.STDOUT,
-        start_new_session=True,
+        CODEMAN_DIR, os.path.join(CODEMAN_DIR, "server.log"), codeman_server_alive,
     )
-    for _ in range(6):
-        time.sleep(1)
-        if codeman_server_alive():
-            return True
-    return False
 
 
 # ── Dolt helpers ─────────────────────────────────────────────────────────
@@ -259,12 +407,7 @@ def check_dolt_installed() -> bool:
 
 def dolt_server_alive() -> bool:
     """Check if dolt sql-server is responding on DOLT_PORT."""
-    import socket
-    try:
-        with socket.create_connection(("127.0.0.1", DOLT_PORT), timeout=2):
-            return True
-    except (OSError, ConnectionRefusedError):
-        return False
+    return _port_open("127.0.0.1", DOLT_PORT)
 
 
 def start_dolt_server() -> bool:
@@ -273,9 +416,8 @@ def start_dolt_server() -> bool:
         return True
     if not check_dolt_installed():
         return False
-    import time
     # Use ~/.dolt/server as the data directory
-    data_dir = os.path.join(os.path.expanduser("~"), ".dolt", "server")
+    data_dir = os.path.join(_HOME, ".dolt", "server")
     os.makedirs(data_dir, exist_ok=True)
     # Initialize dolt repo if not already
     if not os.path.isdir(os.path.join(data_dir, ".dolt")):
@@ -284,19 +426,10 @@ def start_dolt_server() -> bool:
             cwd=data_dir,
             capture_output=True,
         )
-    log_file = os.path.join(data_dir, "server.log")
-    subprocess.Popen(
+    return _spawn_server(
         ["dolt", "sql-server", "--port", str(DOLT_PORT)],
-        cwd=data_dir,
-        stdout=open(log_file, "a"),
-        stderr=subprocess.STDOUT,
-        start_new_session=True,
+        data_dir, os.path.join(data_dir, "server.log"), dolt_server_alive,
     )
-    for _ in range(6):
-        time.sleep(1)
-        if dolt_server_alive():
-            return True
-    return False
 
 
 # ── Dep installation ──────────────────────────────────────────────────────────
@@ -313,23 +446,85 @@ def ensure_dep(cmd: str, name: str, installers: dict[str, str]) -> bool:
         log(f"  Cannot auto-install {name} on {PLATFORM}. Install manually.")
         return False
     log(f"  Installing {name}...")
-    return run(install_cmd)
+    ok = run(install_cmd)
+    command_exists.cache_clear()  # PATH contents changed
+    return ok
 
 
 # ── Git helpers ───────────────────────────────────────────────────────────────
 
 
+# Just enough of git's config syntax to find remote.origin.url
+_GIT_SECTION_RE = re.compile(r'\[\s*([A-Za-z0-9.-]+)\s*(?:"([^"\\]*)")?\s*\](?:\s*[#;].*)?')
+_GIT_URL_RE = re.compile(r'url\s*=\s*([^\s"\\#;]+)(?:\s*[#;].*)?', re.I)
+
+
+@functools.lru_cache(maxsize=None)
+def _git_config_outside_repo() -> bool:
+    """True if config beyond .git/config could change what get-url reports."""
+    if any(k.startswith("GIT_CONFIG") for k in os.environ):
+        return True
+    xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.join(_HOME, ".config")
+    for path in (os.path.join(_HOME, ".gitconfig"), os.path.join(xdg, "git", "config"),
+                 "/etc/gitconfig"):
+        try:
+            with open(path, "rb") as f:
+                text = f.read().lower()
+        except OSError:
+            continue
+        if b"insteadof" in text or b"[include" in text:
+            return True
+    return False
+
+
+def _git_get_url(cwd: str | None) -> str | None:
+    out = run_capture(["git", "remote", "get-url", "origin"], cwd=cwd)
+    return out.strip() if out is not None else None
+
+
 def git_remote_url(cwd: str | None = None) -> str | None:
-    """Get git remote origin URL for the given directory."""
-    cmd = "git remote get-url origin"
+    """Get git remote origin URL for the given directory.
+
+    Read from .git/config when that is unambiguous. Anything the simple parse
+    can't vouch for (subdirectories, worktrees, includes, url rewrites, quoted
+    or continued values) goes to `git remote get-url`.
+    """
+    git_dir = os.path.join(cwd or os.curdir, ".git")
+    if _git_config_outside_repo() or not os.path.isdir(git_dir):
+        return _git_get_url(cwd)
     try:
-        r = subprocess.run(
-            cmd, shell=True, check=True, capture_output=True, text=True,
-            cwd=cwd,
-        )
-        return r.stdout.strip()
-    except subprocess.CalledProcessError:
-        return None
+        with open(os.path.join(git_dir, "config"), encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return _git_get_url(cwd)
+    if "insteadof" in text.lower():
+        return _git_get_url(cwd)
+
+    in_origin = seen_origin = False
+    for line in text.splitlines():
+        s = line.strip()
+        if not s or s[0] in "#;":
+            continue
+        if s[0] == "[":
+            m = _GIT_SECTION_RE.fullmatch(s)
+            section = m.group(1).lower() if m else ""
+            if not m or section.startswith(("include", "remote.")):
+                return _git_get_url(cwd)
+            in_origin = section == "remote" and m.group(2) == "origin"
+            seen_origin = seen_origin or in_origin
+        elif in_origin and s.split("=", 1)[0].strip().lower() == "url":
+            m = _GIT_URL_RE.fullmatch(s)
+            return m.group(1) if m else _git_get_url(cwd)
+    # An origin without a url line is unusual; let git decide what it means
+    return _git_get_url(cwd) if seen_origin else None
+
+
+# (substring of the lowercased URL, tracker type), checked in order
+_REPO_HOSTS = (
+    ("github.com", "github"),
+    ("gitlab", "gitlab"),
+    ("bitbucket", "bitbucket"),
+)
 
 
 def detect_repo_host(remote_url: str) -> str | None:
@@ -337,36 +532,37 @@ def detect_repo_host(remote_url: str) -> str | None:
     if not remote_url:
         return None
     url = remote_url.lower()
-    if "github.com" in url:
-        return "github"
-    if "gitlab" in url:
-        return "gitlab"
-    if "bitbucket" in url:
-        return "bitbucket"
+    for needle, host in _REPO_HOSTS:
+        if needle in url:
+            return host
     return None
 
 
+_ORG_REPO_RE = re.compile(r"[:/]([^/]+/[^/]+?)(?:\.git)?$")
+
+
 def extract_org_repo(remote_url: str) -> str | None:
     """Extract 'org/repo' from a git remote URL."""
     if not remote_url:
         return None
     # SSH: git@github.com:org/repo.git
-    m = re.search(r"[:/]([^/]+/[^/]+?)(?:\.git)?$", remote_url)
+    m = _ORG_REPO_RE.search(remote_url)
     return m.group(1) if m else None
 
 
 # ── Marker file (auto-setup TTL) ─────────────────────────────────────────────
 
-MARKER_PATH = os.path.join(os.path.expanduser("~"), ".claude", ".toolkit-setup-done")
+MARKER_PATH = os.path.join(_CLAUDE_DIR, ".toolkit-setup-done")
 MAX_AGE_DAYS = 7
 
 
 def marker_is_fresh() -> bool:
     """Check if the auto-setup marker exists and is less than MAX_AGE_DAYS old."""
-    if not os.path.isfile(MARKER_PATH):
+    try:
+        mtime = os.stat(MARKER_PATH).st_mtime
+    except OSError:
         return False
-    import time
-    age_days = (time.time() - os.path.getmtime(MARKER_PATH)) / 86400
+    age_days = (time.time() - mtime) / 86400
     return age_days < MAX_AGE_DAYS
 
 
@@ -377,8 +573,8 @@ def touch_marker():
 
 def marker_mtime_str() -> str | None:
     """Return human-readable mtime of the marker file."""
-    if not os.path.isfile(MARKER_PATH):
+    try:
+        t = os.stat(MARKER_PATH).st_mtime
+    except OSError:
         return None
-    import time
-    t = os.path.getmtime(MARKER_PATH)
     return time.strftime("%Y-%m-%d %H:%M", time.localtime(t))
@@ -10,11 +10,11 @@ from lib import (
     BOLD, CYAN, DIM, GREEN, RED, RESET, YELLOW,
     CODEMAN_DIR, CODEMAN_PORT,
     MAIL_DIR, MAIL_PORT, MAIL_TOKEN_FILE,
-    check_codeman_installed, check_mail_installed, check_mail_mcp,
+    check_codeman_installed, check_dolt_installed, check_mail_installed, check_mail_mcp,
     check_marketplace, check_mcp, check_plugin, codeman_server_alive,
     command_exists, configure_serena, ensure_dep,
-    generate_mail_token, log, mail_server_alive, read_mail_token, run,
-    run_capture, start_codeman, start_mail_server,
+    generate_mail_token, log, mail_server_alive, probe_all, read_mail_token,
+    run, run_capture, start_codeman, start_mail_server,
 )
 
 # ── Tool definitions ──────────────────────────────────────────────────────────
@@ -130,7 +130,7 @@ tool(
 # --- Dolt ---
 tool(
     "dolt", "Dolt", "Git-for-data SQL server (required by Beads)",
-    check_fn=lambda: command_exists("dolt"),
+    check_fn=check_dolt_installed,
     install_fn=lambda: ensure_dep("dolt", "Dolt", {
         "darwin": "brew install dolt",
         "linux": 'sudo bash -c "curl -L https://github.com/dolthub/dolt/releases/latest/download/install.sh | bash"',
@@ -149,6 +149,8 @@ def _install_beads():
     if not command_exists("bd"):
         log("  Skipping Beads plugin: bd CLI not available")
         return False
+    if check_plugin("beads"):
+        return True  # Only the CLI was missing
     if not check_marketplace("steveyegge/beads"):
         run("claude plugin marketplace add steveyegge/beads")
     return run("claude plugin install beads")
@@ -197,10 +199,11 @@ def _install_mail():
         subprocess.run(
             "uv venv --python 3.13 && uv sync",
             shell=True, check=True, cwd=MAIL_DIR,
-            capture_output=True, text=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,  # stderr only, for the error
         )
     except subprocess.CalledProcessError as e:
-        log(f"  Failed to set up environment: {e.stderr[:200] if e.stderr else 'unknown error'}")
+        err = e.stderr[:200].decode("utf-8", "replace") if e.stderr else "unknown error"
+        log(f"  Failed to set up environment: {err}")
         return False
 
     # Generate auth token
@@ -208,17 +211,21 @@ def _install_mail():
     if not token:
         token = generate_mail_token()
         os.makedirs(os.path.dirname(MAIL_TOKEN_FILE), exist_ok=True)
-        with open(MAIL_TOKEN_FILE, "w") as f:
+        # Lock the file down before the token goes in, not after
+        fd = os.open(MAIL_TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.chmod(MAIL_TOKEN_FILE, 0o600)  # O_CREAT's mode only applies to new files
+        with os.fdopen(fd, "w") as f:
             f.write(token)
-        os.chmod(MAIL_TOKEN_FILE, 0o600)
         log("  Generated auth token")
 
     # Write .env for the server
     env_file = os.path.join(MAIL_DIR, ".env")
     with open(env_file, "w") as f:
-        f.write(f"HTTP_PORT={MAIL_PORT}\n")
-        f.write(f"HTTP_BEARER_TOKEN={token}\n")
-        f.write("WORKTREES_ENABLED=1\n")
+        f.write(
+            f"HTTP_PORT={MAIL_PORT}\n"
+            f"HTTP_BEARER_TOKEN={token}\n"
+            "WORKTREES_ENABLED=1\n"
+        )
 
     # Register MCP server in Claude Code (remove first if exists from prior install)
     log("  Registering MCP server...")
@@ -287,7 +294,7 @@ def _uninstall_codeman():
 
 tool(
     "codeman", "Codeman", "WebUI for Claude Code sessions (tmux, respawn, visualization)",
-    check_fn=lambda: check_codeman_installed(),
+    check_fn=check_codeman_installed,
     install_fn=_install_codeman,
     uninstall_fn=_uninstall_codeman,
     deps=["npm", "tmux", "git"],
@@ -321,13 +328,16 @@ def main():
     log("Checking installed tools...")
     log()
 
-    status = {}
-    for id_, t in TOOLS.items():
-        try:
-            installed = t["check"]()
-        except Exception:
-            installed = False
+    # --install X only needs X's row; otherwise every tool is probed for the menu
+    shown = {INSTALL_TARGET: TOOLS[INSTALL_TARGET]} if INSTALL_TARGET in TOOLS else TOOLS
 
+    # Checks are independent reads and probes; run them together
+    installed_by_id = probe_all({id_: t["check"] for id_, t in shown.items()})
+
+    status = {}
+    lines = []
+    for id_, t in shown.items():
+        installed = installed_by_id[id_]
         missing_deps = [d for d in t["deps"] if not command_exists(d)]
         status[id_] = {"installed": installed, "missing_deps": missing_deps}
 
@@ -341,7 +351,8 @@ def main():
             line += f" {DIM}[optional]{RESET}"
         elif t["per_project"]:
             line += f" {DIM}[per-project]{RESET}"
-        log(line)
+        lines.append(line)
+    log("\n".join(lines))
 
     # Ensure mail server is running (if installed)
     if check_mail_installed() and not mail_server_alive():
@@ -362,17 +373,16 @@ def main():
     log()
 
     # Determine what to install
-    not_installed = [id_ for id_, t in TOOLS.items()
+    not_installed = [id_ for id_, t in shown.items()
                      if not status[id_]["installed"] and not t["optional"]]
-    not_installed_opt = [id_ for id_, t in TOOLS.items()
+    not_installed_opt = [id_ for id_, t in shown.items()
                          if not status[id_]["installed"] and t["optional"]]
 
-    if not not_installed and not not_installed_opt:
-        log("All tools are already installed!")
-        return
-
     if INSTALL_TARGET:
         selected = [INSTALL_TARGET]
+    elif not not_installed and not not_installed_opt:
+        log("All tools are already installed!")
+        return
     elif NON_INTERACTIVE:
         selected = not_installed
         if not selected:
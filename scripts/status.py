@@ -2,18 +2,21 @@
 """Toolkit status — show installed tools and per-project state."""
 
 import os
+import re
 import sys
 
 sys.path.insert(0, os.path.dirname(__file__))
 from lib import (
     BOLD, CYAN, DIM, GREEN, RESET, YELLOW,
     check_mail_installed, check_mail_mcp,
-    check_mcp, check_plugin, command_exists, log, marker_mtime_str,
+    check_mcp, check_plugin, command_exists, log, marker_mtime_str, probe_all,
 )
 
 HOME = os.path.expanduser("~")
 CWD = os.getcwd()
 
+_ATLAS_NAME_RE = re.compile(r"^name:\s*(.+)$", re.M)
+
 
 def main():
     log()
@@ -42,14 +45,14 @@ def main():
          lambda: os.path.isdir(os.path.join(CWD, "_bmad")), True),
     ]
 
-    for id_, name, desc, check_fn, optional in tools:
-        try:
-            installed = check_fn()
-        except Exception:
-            installed = False
+    installed_by_id = probe_all({id_: check_fn for id_, _, _, check_fn, _ in tools})
+    lines = []
+    for id_, name, desc, _, optional in tools:
+        installed = installed_by_id[id_]
         icon = f"{GREEN}✓{RESET}" if installed else f"{DIM}·{RESET}"
         opt = f" {DIM}[optional]{RESET}" if optional else ""
-        log(f"  {icon} {id_:<12} {name} — {desc}{opt}")
+        lines.append(f"  {icon} {id_:<12} {name} — {desc}{opt}")
+    log("\n".join(lines))
 
     # ── Per-project state ─────────────────────────────────────────────────
 
@@ -71,9 +74,8 @@ def main():
         if has_atlas:
             # Try to extract name from atlas.yaml
             try:
-                content = open(atlas_config).read()
-                import re
-                m = re.search(r'^name:\s*(.+)$', content, re.M)
+                with open(atlas_config) as f:
+                    m = _ATLAS_NAME_RE.search(f.read())
                 aname = m.group(1).strip().strip('"').strip("'") if m else project_name
             except OSError:
                 aname = project_name
@@ -93,12 +95,11 @@ def main():
 
         # Check Agent Mail guard
         pre_commit = os.path.join(CWD, ".git", "hooks", "pre-commit")
-        has_guard = False
-        if os.path.isfile(pre_commit):
-            try:
-                has_guard = "agent" in open(pre_commit).read().lower()
-            except OSError:
-                pass
+        try:
+            with open(pre_commit, "rb") as f:
+                has_guard = b"agent" in f.read().lower()
+        except OSError:
+            has_guard = False
         if has_guard:
             log(f"  {GREEN}✓{RESET} {'mail-guard':<12} Pre-commit guard installed")
         elif check_mail_installed():
@@ -81,6 +81,7 @@ def main():
     log()
 
     installed = []
+    lines = []
     for id_, t in TOOLS.items():
         try:
             found = t["check"]()
@@ -88,9 +89,10 @@ def main():
             found = False
 
         icon = f"{GREEN}✓{RESET}" if found else f"{DIM}·{RESET}"
-        log(f"  {icon} {id_:<10} {t['name']}")
+        lines.append(f"  {icon} {id_:<10} {t['name']}")
         if found:
             installed.append(id_)
+    log("\n".join(lines))
 
     log()
 